@@ -14,14 +14,21 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import base64
+import json
 import time
-from threading import Lock
-from typing import Optional
+from http.cookiejar import DefaultCookiePolicy
+from threading import Condition, Lock
+from typing import Optional, Tuple
 
-import jwt
 import requests
+from requests.adapters import HTTPAdapter
 from .api_exception import ApiException
 
+# Token expiry is given in epoch seconds, so the current time must stay on the wall clock
+_now = time.time
+
 
 class JWTTokenManager:
     """An abstract class to contain functionality for parsing, storing, and requesting JWT tokens.
@@ -46,13 +53,23 @@ class JWTTokenManager:
         token_info (dict): The most token_response from request_token.
         expire_time (int): The time in epoch seconds when the current token within token_info will expire.
         refresh_time (int): The time in epoch seconds when the current token within token_info should be refreshed.
-        request_time (int): The time the last outstanding token request was issued
-        lock (Lock): Lock variable to serialize access to refresh/request times
+        request_time (float): The monotonic clock time the last outstanding token request was issued,
+            or 0 if no request is outstanding
+        lock (Condition): Condition variable to serialize access to refresh/request times
+            and to wake callers waiting on an active token request
         http_config (dict): A dictionary containing values that control the timeout, proxies, and etc of HTTP requests.
     """
 
     # pylint: disable=too-many-instance-attributes
 
+    POOL_CONNECTIONS = 2
+    POOL_MAXSIZE = 20
+
+    # A single session shared by all token managers so that token requests
+    # to the same endpoint reuse one pool of keep-alive connections
+    _shared_session = None
+    _session_lock = Lock()
+
     def __init__(self, url: str, *, disable_ssl_verification: bool = False, token_name: Optional[str] = None) -> None:
         self.url = url
         self.disable_ssl_verification = disable_ssl_verification
@@ -61,8 +78,10 @@ class JWTTokenManager:
         self.expire_time = 0
         self.refresh_time = 0
         self.request_time = 0
-        self.lock = Lock()
+        self.lock = Condition()
         self.http_config = {}
+        self._decoded_token = (None, None, None)
+        self._async_lock = (None, None)
 
     def get_token(self) -> str:
         """Get a token to be used for authentication.
@@ -75,6 +94,13 @@ class JWTTokenManager:
         Returns:
             str: A valid access token
         """
+        # Fast path: a fresh token can be returned without taking the lock
+        current_time = _now()
+        refresh_time = self.refresh_time
+        expire_time = self.expire_time
+        if current_time < refresh_time and current_time <= expire_time:
+            return self.token_info.get(self.token_name)
+
         if self._is_token_expired():
             self.paced_request_token()
 
@@ -84,6 +110,27 @@ class JWTTokenManager:
 
         return self.token_info.get(self.token_name)
 
+    async def async_get_token(self) -> str:
+        """Get a token to be used for authentication without blocking the event loop.
+
+        A fresh token is returned directly. Otherwise one coroutine at a time runs
+        get_token in the event loop's default executor; the others wait on an
+        asyncio lock rather than tying up executor threads, then re-check the token.
+
+        Returns:
+            str: A valid access token
+        """
+        current_time = _now()
+        if current_time < self.refresh_time and current_time <= self.expire_time:
+            return self.token_info.get(self.token_name)
+
+        loop = asyncio.get_event_loop()
+        async with self._get_async_lock(loop):
+            current_time = _now()
+            if current_time < self.refresh_time and current_time <= self.expire_time:
+                return self.token_info.get(self.token_name)
+            return await loop.run_in_executor(None, self.get_token)
+
     def set_disable_ssl_verification(self, status: bool = False) -> None:
         """Sets the ssl verification to enabled or disabled.
 
@@ -92,6 +139,28 @@ class JWTTokenManager:
         """
         self.disable_ssl_verification = status
 
+    def _get_async_lock(self, loop: asyncio.AbstractEventLoop) -> asyncio.Lock:
+        """Return the lock serializing async token requests on `loop`, creating it on first use."""
+        lock_loop, lock = self._async_lock
+        if lock_loop is not loop:
+            # An asyncio.Lock may only be used on the loop it was created for
+            lock = asyncio.Lock()
+            self._async_lock = (loop, lock)
+        return lock
+
+    @classmethod
+    def close_shared_session(cls) -> None:
+        """Close the pooled HTTP connections used for token requests.
+
+        The connections are shared by all token managers; a new pool is
+        created by the next token request.
+        """
+        with JWTTokenManager._session_lock:
+            session = JWTTokenManager._shared_session
+            JWTTokenManager._shared_session = None
+        if session is not None:
+            session.close()
+
     def paced_request_token(self) -> None:
         """
         Paces requests to request_token.
@@ -101,32 +170,40 @@ class JWTTokenManager:
         The first caller into this method records its `request_time` and
         then issues the token request. Subsequent callers will check the
         `request_time` to see if a request is active (has been issued within
-        the past 60 seconds), and if so will sleep for a short time interval
-        (currently 0.5 seconds) before checking again. The check for an active
-        request and update of `request_time` are serailized by the `lock`
-        variable so that only one caller can become the active requester
-        with a 60 second interval.
-
-        Threads that sleep waiting for the active request to complete will
-        eventually find a newly valid token and return, or 60 seconds will
-        elapse and a new thread will assume the role of the active request.
+        the past 60 seconds), and if so will wait on the `lock` condition
+        until the active requester stores the new token and notifies them.
+        The check for an active request and update of `request_time` are
+        serailized by the `lock` condition so that only one caller can become
+        the active requester with a 60 second interval.
+
+        Threads that wait for the active request to complete are woken as
+        soon as a newly valid token is stored or the active request fails,
+        or 60 seconds will elapse; in the latter two cases a new thread will
+        assume the role of the active request.
         """
-        while self._is_token_expired():
-            current_time = self._get_current_time()
-
+        with self.lock:
+            while True:
+                if not self._is_token_expired():
+                    return
+                # The pacing interval is measured on the monotonic clock so that
+                # wall-clock adjustments can't stretch or cut it short
+                request_clock = time.monotonic()
+                if not self.request_time or self.request_time <= (request_clock - 60):
+                    self.request_time = request_clock
+                    break
+                self.lock.wait(timeout=self.request_time + 60 - request_clock)
+
+        # The token request is issued without holding the lock
+        try:
+            token_response = self.request_token()
+            self._save_token_info(token_response)
+        finally:
             with self.lock:
-                request_active = self.request_time > (current_time - 60)
-                if not request_active:
-                    self.request_time = current_time
-
-            if not request_active:
-                token_response = self.request_token()
-                self._save_token_info(token_response)
-                self.request_time = 0
-                return
-
-            time.sleep(0.5)  # Sleep for 0.5 seconds before checking token again
-
+                # A request that outlived the pacing interval may have been superseded;
+                # leave the newer request's marker in place
+                if self.request_time == request_clock:
+                    self.request_time = 0
+                self.lock.notify_all()
 
     def request_token(self) -> None:
         """Should be overridden by child classes.
@@ -138,9 +215,25 @@ class JWTTokenManager:
             'request_token MUST be overridden by a subclass of JWTTokenManager.'
         )
 
-    @staticmethod
-    def _get_current_time() -> int:
-        return int(time.time())
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Return the shared session whose connections are kept alive across token requests."""
+        session = JWTTokenManager._shared_session
+        if session is None:
+            with JWTTokenManager._session_lock:
+                session = JWTTokenManager._shared_session
+                if session is None:
+                    session = requests.Session()
+                    # The session is shared by token managers with different credentials,
+                    # so cookies from one token response must not be sent with another's request
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                    adapter = HTTPAdapter(pool_connections=cls.POOL_CONNECTIONS,
+                                          pool_maxsize=cls.POOL_MAXSIZE,
+                                          max_retries=0)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    JWTTokenManager._shared_session = session
+        return session
 
     def _is_token_expired(self) -> bool:
         """
@@ -151,7 +244,7 @@ class JWTTokenManager:
         bool
             True if token is expired; False otherwise
         """
-        current_time = self._get_current_time()
+        current_time = _now()
         return self.expire_time < current_time
 
     def _token_needs_refresh(self) -> bool:
@@ -163,7 +256,10 @@ class JWTTokenManager:
         bool
             True if token needs refresh; False otherwise
         """
-        current_time = self._get_current_time()
+        current_time = _now()
+        # Cheap unlocked check first; the locked re-check keeps the refresh single-flight
+        if self.refresh_time >= current_time:
+            return False
 
         with self.lock:
             needs_refresh = self.refresh_time < current_time
@@ -187,16 +283,54 @@ class JWTTokenManager:
         self.token_info = token_response
         access_token = token_response.get(self.token_name)
 
-        # The time of expiration is found by decoding the JWT access token
-        decoded_response = jwt.decode(access_token, verify=False)
-        # exp is the time of expire and iat is the time of token retrieval
-        exp = decoded_response.get('exp')
-        iat = decoded_response.get('iat')
+        exp, iat = self._extract_exp_and_iat(access_token)
 
         self.expire_time = exp
         buffer = (exp - iat) * 0.2
         self.refresh_time = self.expire_time - buffer
 
+    def _extract_exp_and_iat(self, access_token: str) -> Tuple[int, int]:
+        """
+        Decode the access token and return its `exp` and `iat` claims.
+
+        The claims of the most recently decoded token are cached so that saving
+        the same token again does not decode it again.
+
+        Parameters
+        ----------
+        access_token : str
+            The JWT access token
+
+        Returns
+        -------
+        tuple
+            The time of expiration and the time of token retrieval
+
+        Raises
+        ------
+        ValueError
+            If the access token is not a well-formed JWT
+        """
+        if isinstance(access_token, bytes):
+            access_token = access_token.decode('utf-8')
+        cached_token, exp, iat = self._decoded_token
+        if cached_token is not None and cached_token == access_token:
+            return exp, iat
+
+        # The time of expiration is found by decoding the payload segment of the JWT access token;
+        # the signature is not verified, so the header and signature segments are not needed
+        try:
+            payload = access_token.split('.', 2)[1]
+            padding = '=' * (-len(payload) % 4)
+            decoded_response = json.loads(base64.urlsafe_b64decode(payload + padding).decode('utf-8'))
+            # exp is the time of expire and iat is the time of token retrieval
+            exp = decoded_response.get('exp')
+            iat = decoded_response.get('iat')
+        except (AttributeError, IndexError, ValueError) as err:
+            raise ValueError('The access token is not a valid JWT') from err
+        self._decoded_token = (access_token, exp, iat)
+        return exp, iat
+
     def _request(self,
                  method,
                  url,
@@ -206,13 +340,12 @@ class JWTTokenManager:
                  data=None,
                  auth_tuple=None,
                  **kwargs) -> dict:
-        kwargs = dict({"timeout": 60}, **kwargs)
-        kwargs = dict(kwargs, **self.http_config)
+        kwargs = {"timeout": 60, **kwargs, **self.http_config}
 
         if self.disable_ssl_verification:
             kwargs['verify'] = False
 
-        response = requests.request(
+        response = type(self)._get_session().request(
             method=method,
             url=url,
             headers=headers,
@@ -16,12 +16,21 @@
 # from ibm_cloud_sdk_core.authenticators import Authenticator
 import datetime
 import json as json_import
+from functools import lru_cache
 from os import getenv, environ, getcwd
 from os.path import isfile, join, expanduser
-from typing import List, Union
+from typing import List, Optional, Union
 
 import dateutil.parser as date_parser
 
+_DEFAULT_CREDENTIALS_FILE_NAME = 'ibm-credentials.env'
+
+_BOOL_STRINGS = {True: 'true', False: 'false'}
+
+# The most recently parsed VCAP_SERVICES value and its parsed form, which rarely
+# change within a process; replaced as a whole so readers never see a mixed pair
+_vcap_cache = (None, None)
+
 def has_bad_first_or_last_char(val: str) -> bool:
     """Returns true if a string starts with any of: {," ; or ends with any of: },".
 
@@ -31,7 +40,7 @@ def has_bad_first_or_last_char(val: str) -> bool:
     Returns:
         Whether or not the string starts or ends with bad characters.
     """
-    return val is not None and (val.startswith('{') or val.startswith('"') or val.endswith('}') or val.endswith('"'))
+    return bool(val) and (val[0] in '{"' or val[-1] in '}"')
 
 def remove_null_values(dictionary: dict) -> dict:
     """Create a new dictionary without keys mapped to null values.
@@ -59,14 +68,14 @@ def cleanup_values(dictionary: dict) -> dict:
         The dictionary with certain keys mapped to s and not booleans.
     """
     if isinstance(dictionary, dict):
-        return {k: cleanup_value(v) for (k, v) in dictionary.items()}
+        # pylint: disable=unidiomatic-typecheck
+        return {k: (_BOOL_STRINGS[v] if type(v) is bool else v) for (k, v) in dictionary.items()}
     return dictionary
 
 def cleanup_value(value: any) -> any:
     """Convert a boolean value to string."""
-    if isinstance(value, bool):
-        return 'true' if value else 'false'
-    return value
+    # The type check keeps 1 and 0, which hash equal to True and False, unconverted
+    return _BOOL_STRINGS[value] if type(value) is bool else value  # pylint: disable=unidiomatic-typecheck
 
 def datetime_to_string(val: datetime.datetime) -> str:
     """Convert a datetime object to string.
@@ -83,8 +92,8 @@ def datetime_to_string(val: datetime.datetime) -> str:
     if isinstance(val, datetime.datetime):
         if val.tzinfo is None:
             return val.isoformat() + 'Z'
-        val = val.astimezone(datetime.timezone.utc)
-        return val.isoformat().replace('+00:00', 'Z')
+        val = val.astimezone(datetime.timezone.utc).isoformat()
+        return val[:-6] + 'Z' if val.endswith('+00:00') else val
     return val
 
 def string_to_datetime(string: str) -> datetime.datetime:
@@ -96,7 +105,14 @@ def string_to_datetime(string: str) -> datetime.datetime:
     Returns:
         the de-serialized string as a datetime object.
     """
-    val = date_parser.parse(string)
+    try:
+        # The stdlib parser is much faster; it is missing before Python 3.7
+        # and only accepts a subset of the formats dateutil does
+        val = datetime.datetime.fromisoformat(string)
+    except (AttributeError, ValueError):
+        val = None
+    if val is None:
+        val = date_parser.parse(string)
     if val.tzinfo is not None:
         return val
     return val.replace(tzinfo=datetime.timezone.utc)
@@ -192,10 +208,9 @@ def __read_from_env_variables(service_name: str) -> dict:
     Returns:
         A set of service configuration key-value pairs.
     """
-    config = {}
-    for key, value in environ.items():
-        _parse_key_and_update_config(config, service_name, key, value)
-    return config
+    prefix = _get_config_prefix(service_name)
+    prefix_len = len(prefix)
+    return {key[prefix_len:]: value for key, value in environ.items() if key.startswith(prefix)}
 
 def __read_from_credential_file(service_name: str, *, separator: str = '=') -> dict:
     """Return a config object based on credentials file for a service.
@@ -209,39 +224,42 @@ def __read_from_credential_file(service_name: str, *, separator: str = '=') -> d
     Returns:
         A set of service configuration key-value pairs.
     """
-    default_credentials_file_name = 'ibm-credentials.env'
-
     # File path specified by an env variable
     credential_file_path = getenv('IBM_CREDENTIALS_FILE')
 
-    # Current working directory
+    # Current working directory or home directory
     if credential_file_path is None:
-        file_path = join(
-            getcwd(), default_credentials_file_name)
-        if isfile(file_path):
-            credential_file_path = file_path
-
-    # Home directory
-    if credential_file_path is None:
-        file_path = join(expanduser('~'), default_credentials_file_name)
-        if isfile(file_path):
-            credential_file_path = file_path
+        credential_file_path = _find_default_credential_file(getcwd())
+        if credential_file_path is None:
+            return {}
 
     config = {}
-    if credential_file_path is not None:
-        with open(credential_file_path, 'r') as fobj:
-            for line in fobj:
-                key_val = line.strip().split(separator, 1)
-                if len(key_val) == 2:
-                    key = key_val[0]
-                    value = key_val[1]
-                    _parse_key_and_update_config(config, service_name, key, value)
+    prefix = _get_config_prefix(service_name)
+    prefix_len = len(prefix)
+    with open(credential_file_path, 'r') as fobj:
+        for line in fobj:
+            key, sep, value = line.partition(separator)
+            if sep:
+                key = key.strip()
+                if key.startswith(prefix):
+                    config[key[prefix_len:]] = value.strip()
     return config
 
-def _parse_key_and_update_config(config: dict, service_name: str, key: str, value: str) -> None:
-    service_name = service_name.replace(' ', '_').replace('-', '_').upper()
-    if key.startswith(service_name):
-        config[key[len(service_name) + 1:]] = value
+def _find_default_credential_file(cwd: str) -> Optional[str]:
+    """Return the path of the default credentials file in `cwd` or the home directory, if one exists."""
+    for file_path in (join(cwd, _DEFAULT_CREDENTIALS_FILE_NAME), _get_home_credential_file_path()):
+        if isfile(file_path):
+            return file_path
+    return None
+
+@lru_cache(maxsize=None)
+def _get_home_credential_file_path() -> str:
+    """Return the path of the default credentials file in the home directory."""
+    return join(expanduser('~'), _DEFAULT_CREDENTIALS_FILE_NAME)
+
+def _get_config_prefix(service_name: str) -> str:
+    """Return the normalized prefix of config keys that belong to a service."""
+    return service_name.replace(' ', '_').replace('-', '_').upper() + '_'
 
 def __read_from_vcap_services(service_name: str) -> dict:
     """Return a config object based on the vcap services environment variable.
@@ -255,7 +273,7 @@ def __read_from_vcap_services(service_name: str) -> dict:
     vcap_services = getenv('VCAP_SERVICES')
     vcap_service_credentials = {}
     if vcap_services:
-        services = json_import.loads(vcap_services)
+        services = _parse_vcap_services(vcap_services)
         for key in services.keys():
             for i in range(len(services[key])):
                 if vcap_service_credentials and isinstance(vcap_service_credentials, dict):
@@ -283,4 +301,14 @@ def __read_from_vcap_services(service_name: str) -> dict:
                 new_vcap_creds['AUTH_TYPE'] = 'iam'
                 new_vcap_creds['APIKEY'] = vcap_service_credentials.get('apikey')
                 vcap_service_credentials = new_vcap_creds
-    return vcap_service_credentials
+    # Don't hand out a reference into the cached VCAP_SERVICES structure
+    return dict(vcap_service_credentials) if isinstance(vcap_service_credentials, dict) else vcap_service_credentials
+
+def _parse_vcap_services(vcap_services: str) -> dict:
+    """Return the parsed VCAP_SERVICES value, reusing the previous result if it is unchanged."""
+    global _vcap_cache  # pylint: disable=global-statement
+    raw, parsed = _vcap_cache
+    if vcap_services != raw:
+        parsed = json_import.loads(vcap_services)
+        _vcap_cache = (vcap_services, parsed)
+    return parsed
@@ -60,8 +60,8 @@ setup(name='ibm-cloud-sdk-core',
       version=__version__,
       description='Core library used by SDKs for IBM Cloud Services',
       license='Apache 2.0',
-      install_requires=['requests>=2.0, <3.0', 'python_dateutil>=2.5.3', 'PyJWT >=1.7.1'],
-      tests_require=['responses', 'pytest', 'pytest-rerunfailures', 'tox', 'pylint', 'bumpversion'],
+      install_requires=['requests>=2.0, <3.0', 'python_dateutil>=2.5.3'],
+      tests_require=['responses', 'pytest', 'pytest-rerunfailures', 'PyJWT', 'tox', 'pylint', 'bumpversion'],
       cmdclass={'test': PyTest},
       author='IBM',
       author_email='devexdev@us.ibm.com',
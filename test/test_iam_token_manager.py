@@ -204,3 +204,22 @@ def test_request_token_auth_in_setter_secret_only():
     assert responses.calls[0].request.url == iam_url
     assert responses.calls[0].request.headers.get('Authorization') is None
     assert responses.calls[0].response.text == response
+
+@responses.activate
+def test_request_token_does_not_share_cookies():
+    iam_url = "https://iam.cloud.ibm.com/identity/token"
+    response = """{
+        "access_token": "oAeisG8yqPY7sFR_x66Z15",
+        "token_type": "Bearer",
+        "expires_in": 3600,
+        "expiration": 1524167011,
+        "refresh_token": "jy4gl91BQ"
+    }"""
+    responses.add(responses.POST, url=iam_url, body=response, status=200,
+                  headers={'Set-Cookie': 'sess=apikey-A-session; Path=/'})
+
+    IAMTokenManager("apikeyA").request_token()
+    IAMTokenManager("apikeyB").request_token()
+
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.headers.get('Cookie') is None
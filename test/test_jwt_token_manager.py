@@ -1,11 +1,13 @@
 # pylint: disable=missing-docstring,protected-access
+import asyncio
+import base64
 import time
 import threading
 from typing import Optional
 import jwt
 import pytest
 
-from ibm_cloud_sdk_core import JWTTokenManager, DetailedResponse
+from ibm_cloud_sdk_core import JWTTokenManager, DetailedResponse, ApiException
 
 class JWTTokenManagerMockImpl(JWTTokenManager):
     def __init__(self, url: Optional[str] = None, access_token: Optional[str] = None) -> None:
@@ -48,6 +50,14 @@ class JWTTokenManagerMockImpl(JWTTokenManager):
 def _get_current_time() -> int:
     return int(time.time())
 
+class UnusableLock:
+    """Stands in for the token manager's lock on paths that must not take it."""
+    def __enter__(self):
+        raise AssertionError('lock should not be acquired')
+
+    def __exit__(self, *args):
+        pass
+
 def test_get_token():
     url = "https://iam.cloud.ibm.com/identity/token"
     token_manager = JWTTokenManagerMockImpl(url)
@@ -100,3 +110,143 @@ def test_disable_ssl_verification():
     token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
     token_manager.set_disable_ssl_verification(True)
     assert token_manager.disable_ssl_verification is True
+
+def test_session_shared_and_closed():
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    other_token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    session = token_manager._get_session()
+    assert other_token_manager._get_session() is session
+    adapter = session.get_adapter('https://iam.cloud.ibm.com/identity/token')
+    assert adapter is session.get_adapter('http://iam.cloud.ibm.com/identity/token')
+    assert adapter._pool_maxsize == JWTTokenManager.POOL_MAXSIZE
+    JWTTokenManager.close_shared_session()
+    assert other_token_manager._get_session() is not session
+
+def test_get_token_fast_path_skips_lock(monkeypatch):
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    token = token_manager.get_token()
+
+    def fail(*args, **kwargs):
+        raise AssertionError('fresh token should be returned directly')
+    monkeypatch.setattr(token_manager, 'lock', UnusableLock())
+    monkeypatch.setattr(token_manager, '_token_needs_refresh', fail)
+    monkeypatch.setattr(token_manager, 'paced_request_token', fail)
+    assert token_manager.get_token() == token
+    assert token_manager.request_count == 1
+
+def test_paced_get_token_waiters_wake_on_new_token():
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    threads = [threading.Thread(target=token_manager.paced_request_token) for _ in range(10)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # The mock request takes 0.5 seconds; waiters must not add a polling interval on top
+    assert time.time() - start < 0.9
+    assert token_manager.request_count == 1
+    assert token_manager.request_time == 0
+
+def test_save_token_info_reuses_decoded_claims(monkeypatch):
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    token_response = token_manager.request_token()
+    token_manager._save_token_info(token_response)
+    expire_time = token_manager.expire_time
+
+    def fail_decode(*args, **kwargs):
+        raise AssertionError('token should not be decoded again')
+    monkeypatch.setattr(base64, 'urlsafe_b64decode', fail_decode)
+    token_manager._save_token_info(token_response)
+    assert token_manager.expire_time == expire_time
+
+def test_extract_exp_and_iat():
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    # payload length chosen so that the base64url segment requires padding
+    access_token = jwt.encode({'exp': 1600003600, 'iat': 1600000000, 'sub': 'ab'}, 'secret', algorithm='HS256')
+    if isinstance(access_token, bytes):
+        access_token = access_token.decode('utf-8')
+    assert len(access_token.split('.')[1]) % 4 != 0
+    assert token_manager._extract_exp_and_iat(access_token) == (1600003600, 1600000000)
+
+    for malformed_token in ('not-a-jwt', 'header.!!!.signature', 'header.bm90IGpzb24.signature', None):
+        with pytest.raises(ValueError):
+            token_manager._extract_exp_and_iat(malformed_token)
+
+def test_token_needs_refresh(monkeypatch):
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    token_manager.refresh_time = _get_current_time() + 3600
+    monkeypatch.setattr(token_manager, 'lock', UnusableLock())
+    assert token_manager._token_needs_refresh() is False
+    monkeypatch.undo()
+    token_manager.refresh_time = _get_current_time() - 3600
+    assert token_manager._token_needs_refresh() is True
+    # A second caller finds the refresh already claimed
+    assert token_manager._token_needs_refresh() is False
+
+def test_async_get_token(monkeypatch):
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+
+    async def get_tokens():
+        return await asyncio.gather(*[token_manager.async_get_token() for _ in range(10)])
+
+    loop = asyncio.new_event_loop()
+    executor_jobs = []
+    run_in_executor = loop.run_in_executor
+
+    def counting_run_in_executor(executor, func, *args):
+        executor_jobs.append(func)
+        return run_in_executor(executor, func, *args)
+    monkeypatch.setattr(loop, 'run_in_executor', counting_run_in_executor)
+    try:
+        tokens = loop.run_until_complete(get_tokens())
+        assert tokens == [token_manager.token_info.get('access_token')] * 10
+        assert token_manager.request_count == 1
+        # Waiting callers don't occupy executor threads
+        assert len(executor_jobs) == 1
+        # A fresh token is returned without another request
+        assert loop.run_until_complete(token_manager.async_get_token()) == tokens[0]
+        assert token_manager.request_count == 1
+    finally:
+        loop.close()
+
+def test_paced_get_token_waiters_wake_on_failed_request(monkeypatch):
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    request_token = token_manager.request_token
+    failures = []
+
+    def failing_request_token():
+        if not failures:
+            failures.append(True)
+            time.sleep(0.5)
+            raise ApiException(500)
+        return request_token()
+    monkeypatch.setattr(token_manager, 'request_token', failing_request_token)
+
+    def get_token():
+        try:
+            token_manager.paced_request_token()
+        except ApiException:
+            pass
+
+    threads = [threading.Thread(target=get_token) for _ in range(5)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # A waiter takes over as soon as the first request fails instead of after 60 seconds
+    assert time.time() - start < 5
+    assert token_manager.request_count == 1
+    assert token_manager._is_token_expired() is False
+
+def test_paced_get_token_superseded_request_keeps_new_marker(monkeypatch):
+    token_manager = JWTTokenManagerMockImpl('https://iam.cloud.ibm.com/identity/token')
+    request_token = token_manager.request_token
+
+    def slow_request_token():
+        # Another caller took over after this request outlived the pacing interval
+        token_manager.request_time = time.monotonic()
+        return request_token()
+    monkeypatch.setattr(token_manager, 'request_token', slow_request_token)
+    token_manager.paced_request_token()
+    assert token_manager.request_time != 0
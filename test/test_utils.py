@@ -1,12 +1,15 @@
 # pylint: disable=missing-docstring
 import datetime
+import json
 import os
-
 from typing import Optional
+
+import pytest
 from ibm_cloud_sdk_core import string_to_datetime, datetime_to_string, get_authenticator_from_environment
 from ibm_cloud_sdk_core import string_to_date, date_to_string
-from ibm_cloud_sdk_core import convert_model, convert_list
+from ibm_cloud_sdk_core import convert_model, convert_list, read_external_sources
 from ibm_cloud_sdk_core.authenticators import BasicAuthenticator, IAMAuthenticator
+from ibm_cloud_sdk_core.utils import has_bad_first_or_last_char, remove_null_values, cleanup_values, cleanup_value
 
 def test_string_to_datetime():
     # If the specified string does not include a timezone, it is assumed to be UTC
@@ -24,6 +27,15 @@ def test_string_to_datetime():
     assert date.day == 6
     assert date.hour == 16
     assert date.tzinfo.utcoffset(None) == datetime.timezone.utc.utcoffset(None)
+    # Test date string in a format only dateutil understands
+    date = string_to_datetime('Mar 6 2017 16:00:04 +0600')
+    assert date.day == 6
+    assert date.hour == 16
+    assert date.tzinfo.utcoffset(None).total_seconds() == 6*60*60
+    # A string neither parser understands raises dateutil's error on its own
+    with pytest.raises(ValueError) as err:
+        string_to_datetime('not a date')
+    assert err.value.__context__ is None
 
 def test_datetime_to_string():
     # If specified date is None, return None
@@ -49,6 +61,25 @@ def test_date_conversion():
     assert res == '2017-03-06'
     assert date_to_string(None) is None
 
+def test_has_bad_first_or_last_char():
+    assert has_bad_first_or_last_char('{value') is True
+    assert has_bad_first_or_last_char('"value') is True
+    assert has_bad_first_or_last_char('value}') is True
+    assert has_bad_first_or_last_char('value"') is True
+    assert has_bad_first_or_last_char('va{l"u}e') is False
+    assert has_bad_first_or_last_char('') is False
+    assert has_bad_first_or_last_char(None) is False
+
+def test_remove_null_values_and_cleanup_values():
+    assert remove_null_values({'a': None, 'b': 0, 'c': False}) == {'b': 0, 'c': False}
+    assert cleanup_values({'a': True, 'b': False, 'c': 1, 'd': 0, 'e': 'x'}) == \
+        {'a': 'true', 'b': 'false', 'c': 1, 'd': 0, 'e': 'x'}
+    assert cleanup_values('not a dict') == 'not a dict'
+    assert cleanup_value(True) == 'true'
+    assert cleanup_value(False) == 'false'
+    assert cleanup_value(1) == 1
+    assert cleanup_value(0.0) == 0.0
+
 def test_convert_model():
 
     class MockModel:
@@ -291,3 +322,31 @@ def test_multi_word_service_name():
     assert authenticator is not None
     assert authenticator.token_manager.apikey == '5678efgh'
     del os.environ['PERSONALITY_INSIGHTS_APIKEY']
+
+def test_get_authenticator_ignores_longer_service_name():
+    os.environ['TEST2_APIKEY'] = '5678efgh'
+    os.environ['TEST2_AUTH_TYPE'] = 'iam'
+    assert get_authenticator_from_environment('test') is None
+    del os.environ['TEST2_APIKEY']
+    del os.environ['TEST2_AUTH_TYPE']
+
+def test_vcap_services_parsed_once(monkeypatch):
+    vcap_services = '{"test":[{"credentials":{"url":"https://test.com","apikey":"bogus apikey"}}]}'
+    os.environ['VCAP_SERVICES'] = vcap_services
+    assert read_external_sources('test') == {'AUTH_TYPE': 'iam', 'APIKEY': 'bogus apikey'}
+
+    def fail_loads(*args, **kwargs):
+        raise AssertionError('VCAP_SERVICES should not be parsed again')
+    monkeypatch.setattr(json, 'loads', fail_loads)
+    assert read_external_sources('test') == {'AUTH_TYPE': 'iam', 'APIKEY': 'bogus apikey'}
+    monkeypatch.undo()
+
+    # A changed value is parsed again
+    os.environ['VCAP_SERVICES'] = vcap_services.replace('bogus apikey', 'other apikey')
+    assert read_external_sources('test') == {'AUTH_TYPE': 'iam', 'APIKEY': 'other apikey'}
+
+    # Credentials returned as-is are copies of the cached structure
+    os.environ['VCAP_SERVICES'] = '{"test":[{"credentials":{"url":"https://test.com"}}]}'
+    read_external_sources('test')['url'] = 'changed'
+    assert read_external_sources('test') == {'url': 'https://test.com'}
+    del os.environ['VCAP_SERVICES']